@@ -6,49 +6,77 @@ goal_state = [[1,2,3],
 
 moves = [(1,0),(-1,0),(0,1),(0,-1)]
 
-def get_blank(state):
-    for i in range(3):
-        for j in range(3):
-            if state[i][j] == 0:
-                return i,j
+# A state is packed into one int: cell i (row-major) holds its tile in bits 4i..4i+3
+def encode(state):
+    code = 0
+    for i,tile in enumerate(tile for row in state for tile in row):
+        code |= tile << (4*i)
+    return code
 
-def possible_moves(state):
-    x,y = get_blank(state)
-    for dx,dy in moves:
-        nx,ny = x+dx,y+dy
-        if 0<=nx<3 and 0<=ny<3:
-            new_state = [row[:] for row in state]
-            new_state[x][y],new_state[nx][ny] = new_state[nx][ny],new_state[x][y]
-            yield new_state
+def decode(code):
+    return [[(code >> (4*(3*i+j))) & 0xF for j in range(3)] for i in range(3)]
 
-def is_goal(state):
-    return state == goal_state
+def blank_pos(code):
+    for p in range(9):
+        if (code >> (4*p)) & 0xF == 0:
+            return p
 
-def dfs(state,depth,limit,visited):
-    if is_goal(state):
-        return [state]
-    if depth == limit:
-        return None
-    visited.add(str(state))
-    for nxt in possible_moves(state):
-        if str(nxt) not in visited:
-            path = dfs(nxt,depth+1,limit,visited)
-            if path:
-                return [state]+path
+def neighbor_cells(blank):
+    x,y = divmod(blank,3)
+    return [(x+dx)*3+y+dy for dx,dy in moves if 0<=x+dx<3 and 0<=y+dy<3]
+
+# NEIGHBORS[blank]: (bit shift, cell) of each cell the blank can swap with
+NEIGHBORS = tuple(tuple((4*c,c) for c in neighbor_cells(b)) for b in range(9))
+
+GOAL = encode(goal_state)
+
+def swap_nibbles(code,a,b):
+    # the blank nibble at shift a is 0, so moving the tile is a clear + OR
+    tile = (code >> b) & 0xF
+    return code & ~(0xF << b) | (tile << a)
+
+def is_goal(code):
+    return code == GOAL
+
+def dfs(code,blank,depth,limit,visited):
+    # Explicit stack of [code, blank, depth, next neighbour to try];
+    # the codes on the stack are always the path from the start
+    stack = [[code,blank,depth,0]]
+    while stack:
+        frame = stack[-1]
+        code,blank,depth,k = frame
+        if k == 0:
+            if is_goal(code):
+                return [f[0] for f in stack]
+            if depth == limit:
+                stack.pop()
+                continue
+            visited.add(code)
+        neighbors = NEIGHBORS[blank]
+        if k == len(neighbors):
+            stack.pop()
+            continue
+        frame[3] = k+1
+        shift,nxt_blank = neighbors[k]
+        nxt = swap_nibbles(code,4*blank,shift)
+        if nxt not in visited:
+            stack.append([nxt,nxt_blank,depth+1,0])
     return None
 
 def ids(start):
+    code = encode(start)
+    blank = blank_pos(code)
     limit = 0
     while True:
         visited=set()
-        path = dfs(start,0,limit,visited)
+        path = dfs(code,blank,0,limit,visited)
         if path:
             return path
         limit+=1
 
 def print_path(path):
-    for state in path:
-        for row in state:
+    for code in path:
+        for row in decode(code):
             print(row)
         print("----")
 
@@ -57,7 +85,8 @@ if __name__=="__main__":
                    [4,0,6],
                    [7,5,8]]
     print("DFS (depth=10):")
-    res = dfs(start_state,0,10,set())
+    start = encode(start_state)
+    res = dfs(start,blank_pos(start),0,10,set())
     if res:
         print_path(res)
     else:
@@ -1,17 +1,24 @@
+ROOMS = "AB"
+
+
+def show(state):
+    return {room: (state >> i) & 1 for i, room in enumerate(ROOMS)}
+
+
 def vacuum_cleaner():
-    state = {"A": 1, "B": 1}  
-    location = "A"
-    print("Initial State:", state)
+    state = 0b11  # bit i set = room ROOMS[i] is dirty
+    location = 0
+    print("Initial State:", show(state))
 
-    while 1 in state.values():
-        if state[location] == 1:
-            print(f"Cleaning Room {location}")
-            state[location] = 0
+    while state:
+        if state & (1 << location):
+            print(f"Cleaning Room {ROOMS[location]}")
+            state &= ~(1 << location)
         else:
-            print(f"Room {location} already clean")
-        location = "B" if location == "A" else "A"
+            print(f"Room {ROOMS[location]} already clean")
+        location ^= 1
 
-    print("Final State:", state)
+    print("Final State:", show(state))
     print("All rooms clean ✅")
 
 if __name__ == "__main__":
@@ -6,26 +6,26 @@ def print_board(board):
     print("\n")
 
 
-def check_winner(board, player):
-    for row in board:
-        if all(cell == player for cell in row):
-            return True
-    for col in range(3):
-        if all(board[row][col] == player for row in range(3)):
-            return True
-    if all(board[i][i] == player for i in range(3)):
-        return True
-    if all(board[i][2 - i] == player for i in range(3)):
-        return True
-    return False
+# Each player's cells are kept as a 9-bit int, bit (row * 3 + col)
+WIN_MASKS = (
+    0b000_000_111, 0b000_111_000, 0b111_000_000,  # rows
+    0b001_001_001, 0b010_010_010, 0b100_100_100,  # columns
+    0b100_010_001, 0b001_010_100,                 # diagonals
+)
+FULL_BOARD = 0b111_111_111
+
+
+def check_winner(bits):
+    return any(bits & mask == mask for mask in WIN_MASKS)
 
 
-def is_full(board):
-    return all(cell != " " for row in board for cell in row)
+def is_full(x_bits, o_bits):
+    return x_bits | o_bits == FULL_BOARD
 
 
 def tic_tac_toe():
     board = [[" " for _ in range(3)] for _ in range(3)]
+    bits = {"X": 0, "O": 0}
     current_player = "X"
     while True:
         print_board(board)
@@ -37,11 +37,12 @@ def tic_tac_toe():
             continue
         if 0 <= row < 3 and 0 <= col < 3 and board[row][col] == " ":
             board[row][col] = current_player
-            if check_winner(board, current_player):
+            bits[current_player] |= 1 << (row * 3 + col)
+            if check_winner(bits[current_player]):
                 print_board(board)
                 print(f"🎉 Player {current_player} wins!")
                 break
-            if is_full(board):
+            if is_full(bits["X"], bits["O"]):
                 print_board(board)
                 print("🤝 It's a tie!")
                 break
@@ -27,36 +27,31 @@ def get_user_input():
 
 # ---------- Helper functions ----------
 
+# KB facts
+EATS = frozenset({("Anil", "Peanuts")})
+ALIVE = frozenset({"Anil"})
+KILLED = frozenset()
+FOOD = frozenset({"Apple", "Vegetables"})
+
+
 def resolution_proof():
     """
     Hardcoded reasoning for the given example (can be extended to generic parser).
     Returns True if John likes peanuts can be proved.
     """
 
-    # KB facts and rules:
-    Eats = {("Anil", "Peanuts")}
-    Alive = {"Anil"}
-    Killed = set()
-    Food = {"Apple", "Vegetables"}
-
     # Step 1: From (Alive(Anil)) and (Alive(x) -> not Killed(x)) => not Killed(Anil)
-    if "Anil" in Alive:
-        Killed.discard("Anil")
+    anil_killed = "Anil" in KILLED and "Anil" not in ALIVE
 
     # Step 2: From (Eats(Anil, Peanuts)) and (not Killed(Anil)) => Food(Peanuts)
-    if ("Anil", "Peanuts") in Eats:
-        Food.add("Peanuts")
+    peanuts_is_food = "Peanuts" in FOOD or (("Anil", "Peanuts") in EATS and not anil_killed)
 
     # Step 3: From (Food(Peanuts)) and (Food(x) -> Likes(John, x)) => Likes(John, Peanuts)
-    Likes = set()
-    for f in Food:
-        Likes.add(("John", f))
-
-    # Step 4: Check conclusion
-    if ("John", "Peanuts") in Likes:
+    if peanuts_is_food:
         return True
-    else:
-        return False
+
+    # Step 4: No other rule concludes Likes(John, Peanuts)
+    return False
 
 
 # ---------- Main Program ----------
@@ -1,44 +1,60 @@
 import matplotlib.pyplot as plt
 import networkx as nx
 
-# --- Alpha-Beta Pruning ---
-def alpha_beta(node_id, depth, alpha, beta, maximizing_player, tree, G, node_data, pruned_edges):
-    node_info = node_data[node_id]
-
+# Transposition-table flags: the stored value is exact, a lower bound or an upper bound
+EXACT, LOWER, UPPER = 0, 1, 2
+
+# --- Alpha-Beta Pruning (negamax form) ---
+def negamax(node, depth, alpha, beta, color, last_level, offsets, children, leaf_value, values, pruned_edges, tt):
+    """
+    Alpha-beta search returning the value seen by the player to move (color 1 = MAX, -1 = MIN).
+    tt caches results by node id. create_graph builds a tree, so every node is searched at most
+    once and lookups always miss here; the table only pays off if the same node can be reached
+    along several paths (a DAG-shaped input).
+    """
     # Leaf node
-    if depth == len(tree) - 1:
-        value = tree[depth][node_info['index']]
-        G.nodes[node_id]['value'] = value
-        return value
-
-    if maximizing_player:
-        value = float('-inf')
-        for child_id in node_info['children']:
-            val = alpha_beta(child_id, depth + 1, alpha, beta, False, tree, G, node_data, pruned_edges)
-            value = max(value, val)
-            alpha = max(alpha, value)
-            G.nodes[node_id]['value'] = value
-            if beta <= alpha:
-                # prune remaining children
-                idx = node_info['children'].index(child_id)
-                for pruned in node_info['children'][idx + 1:]:
-                    pruned_edges.append((node_id, pruned))
-                break
-        return value
+    if depth == last_level:
+        value = leaf_value[node]
+        values[node] = value
+        return color * value
+
+    # Reuse a stored result if it is exact or its bound already closes the window
+    # (only possible when node has more than one parent, see the docstring)
+    entry = tt.get(node)
+    if entry is not None:
+        flag, stored = entry
+        if flag == EXACT:
+            return stored
+        if flag == LOWER:
+            alpha = max(alpha, stored)
+        else:
+            beta = min(beta, stored)
+        if beta <= alpha:
+            return stored
+
+    alpha_orig = alpha
+    start, end = offsets[node], offsets[node + 1]
+    value = float('-inf')
+    for k in range(start, end):
+        child = children[k]
+        val = -negamax(child, depth + 1, -beta, -alpha, -color, last_level,
+                       offsets, children, leaf_value, values, pruned_edges, tt)
+        value = max(value, val)
+        alpha = max(alpha, value)
+        values[node] = color * value
+        if beta <= alpha:
+            # prune remaining children
+            for pruned in children[k + 1:end]:
+                pruned_edges.append((node, pruned))
+            break
+
+    if value <= alpha_orig:
+        tt[node] = (UPPER, value)
+    elif value >= beta:
+        tt[node] = (LOWER, value)
     else:
-        value = float('inf')
-        for child_id in node_info['children']:
-            val = alpha_beta(child_id, depth + 1, alpha, beta, True, tree, G, node_data, pruned_edges)
-            value = min(value, val)
-            beta = min(beta, value)
-            G.nodes[node_id]['value'] = value
-            if beta <= alpha:
-                # prune remaining children
-                idx = node_info['children'].index(child_id)
-                for pruned in node_info['children'][idx + 1:]:
-                    pruned_edges.append((node_id, pruned))
-                break
-        return value
+        tt[node] = (EXACT, value)
+    return value
 
 
 # --- Build user-defined tree ---
@@ -87,7 +103,31 @@ def create_graph(tree):
     return G, root_id, node_data
 
 
+def flatten_tree(tree, node_data):
+    """
+    Flattens node_data into CSR-style lists for the search: the children of node n
+    are children[offsets[n]:offsets[n + 1]], and leaf_value[n] is n's leaf value
+    (None for inner nodes).
+    """
+    last_level = len(tree) - 1
+    offsets = [0]
+    children = []
+    leaf_value = []
+    for node_id in range(len(node_data)):
+        info = node_data[node_id]
+        children.extend(info['children'])
+        offsets.append(len(children))
+        leaf_value.append(tree[last_level][info['index']] if info['level'] == last_level else None)
+    return offsets, children, leaf_value
+
+
 # --- Visualization ---
+def copy_values_to_graph(G, values):
+    """The search only fills the flat values list; copy it onto the graph for drawing."""
+    for node_id, value in enumerate(values):
+        G.nodes[node_id]['value'] = value
+
+
 def visualize_tree(G, pruned_edges):
     # Now we can use 'subset' attribute properly
     pos = nx.multipartite_layout(G, subset_key="subset")
@@ -116,13 +156,18 @@ def main():
     print("\n--- Alpha-Beta Pruning Tree Builder ---\n")
     tree = build_tree()
     G, root_id, node_data = create_graph(tree)
+    offsets, children, leaf_value = flatten_tree(tree, node_data)
+    values = [None] * len(leaf_value)
 
     pruned_edges = []
     print("\nStarting Alpha-Beta Pruning...\n")
 
-    root_value = alpha_beta(root_id, 0, float('-inf'), float('inf'), True, tree, G, node_data, pruned_edges)
+    root_value = negamax(root_id, 0, float('-inf'), float('inf'), 1, len(tree) - 1,
+                         offsets, children, leaf_value, values, pruned_edges, {})
     print(f"\nFinal Value at Root Node (MAX): {root_value}\n")
 
+    copy_values_to_graph(G, values)
+
     visualize_tree(G, pruned_edges)
 
 
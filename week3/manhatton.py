@@ -1,38 +1,50 @@
 #!/usr/bin/env python3
 """
-8-Puzzle using A* with Manhattan Distance heuristic
+8-Puzzle using A* (and IDA*) with Manhattan Distance heuristic
 (Pure Python, no extra packages)
 Shows cost and all moves with states.
 """
 
-GOAL_STATE = (1,2,3,4,5,6,7,8,0)
+import heapq
+from itertools import count
+
+# States are packed into one int: cell i holds its tile in bits 4i..4i+3
+def encode(state):
+    code = 0
+    for i, v in enumerate(state):
+        code |= v << (4*i)
+    return code
+
+def decode(code):
+    return tuple((code >> (4*i)) & 0xF for i in range(9))
+
+GOAL_STATE = encode((1,2,3,4,5,6,7,8,0))
+
+# MH[pos][tile]: Manhattan distance of `tile` at cell pos from its goal cell
+MH = [[abs((t-1)//3 - p//3) + abs((t-1)%3 - p%3) if t else 0 for t in range(9)]
+      for p in range(9)]
 
 # Heuristic: Manhattan Distance
 def h_manhattan(state):
-    dist = 0
-    for i, v in enumerate(state):
-        if v != 0:
-            goal_r, goal_c = divmod(v-1, 3)
-            cur_r, cur_c = divmod(i, 3)
-            dist += abs(goal_r - cur_r) + abs(goal_c - cur_c)
-    return dist
+    return sum(MH[p][(state >> (4*p)) & 0xF] for p in range(9))
 
 # Moves
 MOVES = {'Up':-3,'Down':3,'Left':-1,'Right':1}
 
-def valid_neighbors(state):
+# NEIGHBORS[blank]: (cell the blank swaps with, action) for each legal move
+NEIGHBORS = []
+for z in range(9):
+    zr, zc = divmod(z, 3)
+    legal = {'Up': zr > 0, 'Down': zr < 2, 'Left': zc > 0, 'Right': zc < 2}
+    NEIGHBORS.append(tuple((z + delta, action) for action, delta in MOVES.items() if legal[action]))
+
+def valid_neighbors(state, zero_idx):
+    """Return (neighbor, new blank index, action, change in h) for each legal move."""
     neighbors = []
-    zero_idx = state.index(0)
-    zr, zc = divmod(zero_idx, 3)
-    for action, delta in MOVES.items():
-        new_idx = zero_idx + delta
-        if action == 'Left' and zc == 0: continue
-        if action == 'Right' and zc == 2: continue
-        if action == 'Up' and zr == 0: continue
-        if action == 'Down' and zr == 2: continue
-        s = list(state)
-        s[zero_idx], s[new_idx] = s[new_idx], s[zero_idx]
-        neighbors.append((tuple(s), action))
+    for new_idx, action in NEIGHBORS[zero_idx]:
+        tile = (state >> (4*new_idx)) & 0xF
+        s = state & ~(0xF << (4*new_idx)) | (tile << (4*zero_idx))
+        neighbors.append((s, new_idx, action, MH[zero_idx][tile] - MH[new_idx][tile]))
     return neighbors
 
 def is_solvable(state):
@@ -40,61 +52,95 @@ def is_solvable(state):
     inv = sum(1 for i in range(len(arr)) for j in range(i+1,len(arr)) if arr[i]>arr[j])
     return inv % 2 == 0
 
-def pop_min(frontier):
-    """Pick and remove the entry with the lowest f."""
-    best = min(frontier, key=lambda x: x[0])
-    frontier.remove(best)
-    return best
-
 def print_state(state):
+    cells = decode(state)
     for i in range(0, 9, 3):
-        print(state[i:i+3])
+        print(cells[i:i+3])
     print()
 
+def print_solution(path, actions):
+    print(f"✅ Solution found in {len(actions)} moves (Manhattan Distance)\n")
+    for step, (state, move) in enumerate(zip(path, ["Start"]+actions)):
+        print(f"Step {step}: Move = {move}, Cost = {step}")
+        print_state(state)
+
 def astar_manhattan(start):
     if not is_solvable(start):
         print("❌ Puzzle not solvable.")
         return
 
-    frontier = []
+    blank = start.index(0)
+    start = encode(start)
+    # Heap entries carry a counter so ties on (f, g) never compare the rest
+    counter = count()
+    frontier = [(h_manhattan(start), 0, next(counter), start, blank, None, None)]
     g_score = {start:0}
-    frontier.append((h_manhattan(start), 0, start, None, None))
     came_from = {start:(None,None)}
-    closed = set()
 
+    heappush, heappop = heapq.heappush, heapq.heappop
     while frontier:
-        f, g, cur, parent, act = pop_min(frontier)
-        if parent: 
+        f, g, _, cur, blank, parent, act = heappop(frontier)
+        if g > g_score[cur]: continue  # stale entry, a cheaper path was queued later
+        if parent is not None:
             came_from[cur] = (parent, act)
         if cur == GOAL_STATE:
             # Reconstruct path
             path, actions = [], []
             s = cur
-            while s: 
+            while s is not None:
                 p,a = came_from[s]
                 path.append(s)
                 if a: actions.append(a)
                 s = p
             path.reverse(); actions.reverse()
-
-            # Print solution
-            print(f"✅ Solution found in {len(actions)} moves (Manhattan Distance)\n")
-            for step, (state, move) in enumerate(zip(path, ["Start"]+actions)):
-                print(f"Step {step}: Move = {move}, Cost = {step}")
-                print_state(state)
+            print_solution(path, actions)
             return
-        closed.add(cur)
-        for neigh,a in valid_neighbors(cur):
-            if neigh in closed: continue
-            g_new = g_score[cur] + 1
+        h = f - g
+        for neigh, neigh_blank, a, dh in valid_neighbors(cur, blank):
+            g_new = g + 1
             if neigh not in g_score or g_new < g_score[neigh]:
                 g_score[neigh] = g_new
-                f_neigh = g_new + h_manhattan(neigh)
-                frontier.append((f_neigh, g_new, neigh, cur, a))
+                f_neigh = g_new + h + dh
+                heappush(frontier, (f_neigh, g_new, next(counter), neigh, neigh_blank, cur, a))
+
+FOUND = -1
+
+def ida_search(state, blank, prev_blank, g, h, bound, path, actions):
+    """Depth-first search bounded by f = g + h; returns FOUND or the smallest f over the bound."""
+    f = g + h
+    if f > bound: return f
+    if state == GOAL_STATE: return FOUND
+    next_bound = float('inf')
+    for neigh, neigh_blank, a, dh in valid_neighbors(state, blank):
+        if neigh_blank == prev_blank: continue  # don't undo the previous move
+        path.append(neigh); actions.append(a)
+        t = ida_search(neigh, neigh_blank, blank, g+1, h+dh, bound, path, actions)
+        if t == FOUND: return FOUND
+        path.pop(); actions.pop()
+        next_bound = min(next_bound, t)
+    return next_bound
+
+def ida_star(start):
+    """IDA*: same optimal moves as A*, but only the current path is kept in memory."""
+    if not is_solvable(start):
+        print("❌ Puzzle not solvable.")
+        return
+
+    blank = start.index(0)
+    start = encode(start)
+    h = bound = h_manhattan(start)
+    path, actions = [start], []
+    while True:
+        t = ida_search(start, blank, None, 0, h, bound, path, actions)
+        if t == FOUND:
+            print_solution(path, actions)
+            return
+        bound = t
 
 if __name__=="__main__":
     # ✅ solvable test cases
     start = (1,2,3,4,5,6,7,0,8)       # easy
     # start = (1,2,3,5,0,6,4,7,8)     # medium
     # start = (8,6,7,2,5,4,3,0,1)     # hard
-    astar_manhattan(start)
+    ida_star(start)
+    # astar_manhattan(start)          # A*: same move count, but keeps every explored state
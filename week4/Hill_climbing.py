@@ -9,7 +9,7 @@ def objective_function(x, y):
     return np.sin(x**2) * np.cos(y**2)
 
 # --- 2. The Hill Climbing Algorithm ---
-def hill_climbing(objective_fn, bounds, n_iterations, step_size):
+def hill_climbing(objective_fn, bounds, n_iterations, step_size, n_candidates=5):
     """
     Performs the hill climbing search algorithm.
 
@@ -18,43 +18,48 @@ def hill_climbing(objective_fn, bounds, n_iterations, step_size):
         bounds: A list of tuples [(min, max), (min, max), ...] for each dimension.
         n_iterations: The total number of iterations to run.
         step_size: The size of the step to take when exploring neighbors.
+        n_candidates: How many random neighbors to evaluate together per iteration.
 
     Returns:
-        A tuple containing the best solution found (list) and its score.
+        A tuple containing the best solution found (array), its score and the path taken.
     """
+    lower = np.array([b[0] for b in bounds])
+    upper = np.array([b[1] for b in bounds])
+
     # Generate a random starting point within the defined bounds
-    solution = [bounds[i][0] + np.random.rand() * (bounds[i][1] - bounds[i][0]) for i in range(len(bounds))]
+    solution = lower + np.random.rand(len(bounds)) * (upper - lower)
     solution_eval = objective_fn(solution[0], solution[1])
 
-    # Keep track of the path for visualization
-    path = [solution]
+    # Keep track of the path for visualization (at most one new point per iteration)
+    path = np.empty((n_iterations + 1, len(bounds)))
+    path[0] = solution
+    n_written = 1
+    rows = np.arange(n_candidates)
     
     # Main loop
     for i in range(n_iterations):
-        # Take a copy of the current best solution
-        candidate = list(solution)
-        
-        # Generate a random move (perturbation)
-        # Move one variable at a time
-        dim = np.random.randint(0, len(bounds))
-        # Move up or down
-        direction = np.random.choice([-1, 1])
-        
-        candidate[dim] += direction * step_size
+        # Generate a batch of random moves (perturbations) from the current solution
+        # Each candidate moves one variable, up or down
+        candidates = np.tile(solution, (n_candidates, 1))
+        dims = np.random.randint(0, len(bounds), n_candidates)
+        directions = np.random.choice([-1, 1], n_candidates)
+        candidates[rows, dims] += directions * step_size
         
-        # Clip the candidate to stay within the bounds
-        candidate[dim] = max(bounds[dim][0], min(bounds[dim][1], candidate[dim]))
+        # Clip the candidates to stay within the bounds
+        candidates = np.clip(candidates, lower, upper)
 
-        # Evaluate the candidate solution
-        candidate_eval = objective_fn(candidate[0], candidate[1])
+        # Evaluate all candidates in one vectorized call and keep the highest
+        candidate_evals = objective_fn(candidates[:, 0], candidates[:, 1])
+        best = candidate_evals.argmax()
         
         # Check if we should keep the new point (is it higher?)
-        if candidate_eval > solution_eval:
-            solution, solution_eval = candidate, candidate_eval
-            path.append(solution)
+        if candidate_evals[best] > solution_eval:
+            solution, solution_eval = candidates[best], candidate_evals[best]
+            path[n_written] = solution
+            n_written += 1
             print(f'> Iteration {i}, Position=({solution[0]:.4f}, {solution[1]:.4f}), Score={solution_eval:.4f}')
             
-    return solution, solution_eval, np.array(path)
+    return solution, solution_eval, path[:n_written]
 
 
 # --- 3. Run the Algorithm and Visualize ---
@@ -62,11 +67,12 @@ if __name__ == '__main__':
     # Define the bounds of our search space
     bounds = [(-2.0, 2.0), (-2.0, 2.0)]
     # Define hyperparameters
-    iterations = 500
+    iterations = 100
     step = 0.05
+    candidates = 5
     
     # Perform the search
-    best_solution, best_score, path = hill_climbing(objective_function, bounds, iterations, step)
+    best_solution, best_score, path = hill_climbing(objective_function, bounds, iterations, step, candidates)
     
     print("\n--- Search Complete ---")
     print(f"🎯 Best Solution Found: ({best_solution[0]:.5f}, {best_solution[1]:.5f})")
@@ -8,14 +8,20 @@ def objective_function(x):
     """A sample 1D function with a global minimum and several local minima."""
     return (x - 2) * x * (x + 2)**2
 
-# --- 2. The Simulated Annealing Algorithm ---
-def simulated_annealing(objective, bounds, n_iterations, step_size, initial_temp, cooling_rate):
+# --- 2. The Search Grid ---
+def evaluate_grid(objective, bounds, n_points=65536):
+    """Evaluates the objective once on an evenly spaced grid over the bounds."""
+    grid = np.linspace(bounds[0][0], bounds[0][1], n_points)
+    return grid, objective(grid)
+
+# --- 3. The Simulated Annealing Algorithm ---
+def simulated_annealing(grid, fgrid, n_iterations, step_size, initial_temp, cooling_rate):
     """
-    Performs the simulated annealing search algorithm.
+    Performs the simulated annealing search algorithm over a precomputed grid.
 
     Args:
-        objective: The function to be minimized.
-        bounds: A list [(min, max)] for the search space.
+        grid: Evenly spaced points covering the search space.
+        fgrid: The objective (to be minimized) evaluated at each grid point.
         n_iterations: Total number of iterations.
         step_size: The maximum size of a step to take.
         initial_temp: The starting temperature.
@@ -24,51 +30,53 @@ def simulated_annealing(objective, bounds, n_iterations, step_size, initial_temp
     Returns:
         A tuple of the best solution found and its score.
     """
+    last = len(grid) - 1
+    spacing = grid[1] - grid[0]
+
     # Generate a random starting point
-    current_solution = np.random.uniform(bounds[0][0], bounds[0][1])
-    current_eval = objective(current_solution)
+    current_idx = np.random.randint(0, last + 1)
+    current_eval = fgrid[current_idx]
     
     # Keep track of the best solution found so far
-    best_solution, best_eval = current_solution, current_eval
+    best_idx, best_eval = current_idx, current_eval
     
     # Keep track of scores for plotting
     scores = []
     
-    temperature = initial_temp
+    # Draw every random step (in grid cells), acceptance roll and temperature up front
+    steps = np.rint(np.random.uniform(-step_size, step_size, n_iterations) / spacing).astype(int).tolist()
+    accepts = np.random.rand(n_iterations)
+    temps = initial_temp * cooling_rate ** np.arange(n_iterations)
     
     for i in range(n_iterations):
-        # Take a random step
-        candidate = current_solution + np.random.uniform(-step_size, step_size)
-        # Clip to stay within bounds
-        candidate = max(bounds[0][0], min(bounds[0][1], candidate))
+        # Take a random step, clipped to stay within bounds
+        candidate_idx = max(0, min(last, current_idx + steps[i]))
         
-        candidate_eval = objective(candidate)
+        candidate_eval = fgrid[candidate_idx]
         
         # Check if the new candidate is better
         if candidate_eval < best_eval:
-            best_solution, best_eval = candidate, candidate_eval
-            print(f'> Iteration {i}, New Best=({best_solution:.4f}), Score={best_eval:.4f}')
+            best_idx, best_eval = candidate_idx, candidate_eval
+            print(f'> Iteration {i}, New Best=({grid[best_idx]:.4f}), Score={best_eval:.4f}')
 
         # Calculate the difference in energy (cost)
         diff = candidate_eval - current_eval
         
         # If the new solution is better, always accept it
         if diff < 0:
-            current_solution, current_eval = candidate, candidate_eval
+            current_idx, current_eval = candidate_idx, candidate_eval
         else:
             # If the new solution is worse, maybe accept it anyway
             # This is the core of the algorithm
-            acceptance_prob = math.exp(-diff / temperature)
-            if np.random.rand() < acceptance_prob:
-                current_solution, current_eval = candidate, candidate_eval
+            acceptance_prob = math.exp(-diff / temps[i])
+            if accepts[i] < acceptance_prob:
+                current_idx, current_eval = candidate_idx, candidate_eval
 
-        # Cool the temperature
-        temperature *= cooling_rate
         scores.append(best_eval)
         
-    return best_solution, best_eval, scores
+    return grid[best_idx], best_eval, scores
 
-# --- 3. Run the Algorithm and Visualize ---
+# --- 4. Run the Algorithm and Visualize ---
 if __name__ == "__main__":
     # Define the bounds of our search space
     bounds = [(-3.0, 3.0)]
@@ -78,9 +86,12 @@ if __name__ == "__main__":
     temp = 10
     cooling = 0.99
     
+    # Evaluate the landscape once; the search and the plot both reuse it
+    grid, fgrid = evaluate_grid(objective_function, bounds)
+
     # Perform the search
     best_solution, best_score, scores = simulated_annealing(
-        objective_function, bounds, iterations, step, temp, cooling
+        grid, fgrid, iterations, step, temp, cooling
     )
     
     print("\n--- Search Complete ---")
@@ -90,9 +101,7 @@ if __name__ == "__main__":
     # Plotting the results
     plt.figure(figsize=(12, 6))
     plt.subplot(1, 2, 1)
-    x_range = np.arange(bounds[0][0], bounds[0][1], 0.01)
-    y_range = objective_function(x_range)
-    plt.plot(x_range, y_range, label='Objective Function')
+    plt.plot(grid, fgrid, label='Objective Function')
     plt.scatter([best_solution], [best_score], color='red', marker='*', s=150, zorder=5, label=f'Global Minimum Found')
     plt.title('Objective Function Landscape')
     plt.xlabel('x')
@@ -1,5 +1,5 @@
 import re
-from itertools import product
+import keyword
 
 def tt_entails(kb_str: str, alpha_str: str) -> bool:
     """
@@ -20,8 +20,16 @@ def tt_entails(kb_str: str, alpha_str: str) -> bool:
     kb = format_expression(kb_str)
     alpha = format_expression(alpha_str)
 
-    # 1. Get all unique symbols from the KB and alpha
-    symbols = sorted(list(set(re.findall(r'[A-Za-z]+', kb + ' ' + alpha))))
+    # 1. Get all unique symbols from the KB and alpha (skipping the inserted and/or/not)
+    symbols = sorted(s for s in set(re.findall(r'[A-Za-z]+', kb + ' ' + alpha)) if not keyword.iskeyword(s))
+
+    # Compile both sentences once instead of re-parsing them for every model
+    try:
+        kb_code = compile(kb, '<kb>', 'eval')
+        alpha_code = compile(alpha, '<alpha>', 'eval')
+    except SyntaxError as e:
+        print(f"Error evaluating expressions: {e}")
+        return False
     
     print(f"KB: {kb_str}")
     print(f"Query (Alpha): {alpha_str}")
@@ -32,15 +40,19 @@ def tt_entails(kb_str: str, alpha_str: str) -> bool:
     print(header)
     print("-" * len(header))
 
-    # 2. Iterate through all possible models (all 2^n combinations of True/False)
-    for values in product([True, False], repeat=len(symbols)):
+    # 2. Iterate through all possible models (all 2^n combinations of True/False).
+    # Model number `bits` gives symbol i the value of bit n-1-i, inverted so the
+    # table starts from all-True.
+    n = len(symbols)
+    for bits in range(1 << n):
+        values = tuple(not (bits >> (n - 1 - i)) & 1 for i in range(n))
         # A model is a dictionary mapping symbols to True/False
         model = dict(zip(symbols, values))
         
         # 3. Evaluate KB and alpha in the current model
         try:
-            kb_is_true = eval(kb, {}, model)
-            alpha_is_true = eval(alpha, {}, model)
+            kb_is_true = eval(kb_code, {}, model)
+            alpha_is_true = eval(alpha_code, {}, model)
         except Exception as e:
             print(f"Error evaluating expressions: {e}")
             return False
@@ -1,144 +1,375 @@
-import re
-from typing import Set, List, Dict, Tuple, Optional, Generator
+import sys
+from typing import Set, List, Dict, Tuple, Optional, Generator, Callable
 
 # Define types for clarity
 Fact = str
 Substitution = Dict[str, str]
 Rule = Tuple[List[Fact], Fact]
+ParsedFact = Tuple[str, Tuple[str, ...]]
+IndexKey = tuple  # (pred, arity), (pred, arity, position, value) or a whole ground ParsedFact
+ParsedRule = Tuple[List[ParsedFact], List[IndexKey], ParsedFact, Tuple[str, ...], Dict[Tuple[str, ...], Fact]]
+KBIndex = Dict[IndexKey, List[ParsedFact]]
+Trail = List[Tuple[str, Optional[str]]]  # (variable, binding it had before, if any)
+Matcher = Callable[[List[KBIndex]], Generator[Substitution, None, None]]
 
-def parse_fact(fact_string: Fact) -> Tuple[str, List[str]]:
+_PARSE_CACHE: Dict[Fact, ParsedFact] = {}
+_FACT_INTERN: Dict[ParsedFact, Fact] = {}
+_COMPILED_RULES: Dict[Tuple[ParsedFact, ...], Matcher] = {}
+_VARIABLES: Set[str] = set()  # Every parsed argument that is_variable, filled in by parse_fact
+
+def parse_fact(fact_string: Fact) -> ParsedFact:
     """
     Parses a string like 'Predicate(Arg1,Arg2)' into a predicate and its arguments.
-    Example: 'Sells(Robert, T1, A)' -> ('Sells', ['Robert', 'T1', 'A'])
+    Example: 'Sells(Robert, T1, A)' -> ('Sells', ('Robert', 'T1', 'A'))
+    Results are cached, so each distinct string is only split once. Names are interned so
+    comparing and hashing atoms during unification is mostly pointer equality.
     """
-    match = re.match(r"(\w+)\((.*?)\)", fact_string)
-    if not match:
-        return fact_string, []  # Handles facts with no arguments, e.g., 'Goal'
+    parsed = _PARSE_CACHE.get(fact_string)
+    if parsed is not None:
+        return parsed
 
-    predicate = match.group(1)
-    args_str = match.group(2)
-    
-    if not args_str:
-        return predicate, [] # Handles Predicate()
-        
-    args = [arg.strip() for arg in args_str.split(',')]
-    return predicate, args
+    open_idx = fact_string.find('(')
+    if open_idx < 0:
+        parsed = (sys.intern(fact_string), ())  # Handles facts with no arguments, e.g., 'Goal'
+    else:
+        predicate = sys.intern(fact_string[:open_idx])
+        args_str = fact_string[open_idx + 1:fact_string.find(')', open_idx)]
+        if not args_str:
+            parsed = (predicate, ()) # Handles Predicate()
+        else:
+            args = tuple(sys.intern(arg.strip()) for arg in args_str.split(','))
+            _VARIABLES.update(arg for arg in args if is_variable(arg))
+            parsed = (predicate, args)
+
+    _PARSE_CACHE[fact_string] = parsed
+    return parsed
 
 def is_variable(term: str) -> bool:
     """A term is a variable if it's a single lowercase letter or starts with one."""
     return term[0].islower()
 
-def apply_substitution(fact_template: Fact, sub: Substitution) -> Fact:
-    """Applies a substitution to a fact template to generate a concrete fact."""
-    pred, args = parse_fact(fact_template)
+def resolve(sub: Substitution, term: str, compress: bool = True) -> str:
+    """
+    Follows a chain of bindings (x -> y -> Robert) to its end. With compress set, every
+    variable on the chain is pointed straight at the end so later lookups take one step.
+    unify walks without compressing, since rewriting a binding made in an earlier frame
+    would outlive the trail undo of the binding it skipped over.
+    """
+    root = sub.get(term, term)
+    if root == term or root not in sub:
+        return root # Usual case: unbound, or bound straight to a constant
+    path = [term]
+    while root in sub and root not in path:
+        path.append(root)
+        root = sub[root]
+    if compress:
+        for var in path:
+            sub[var] = root
+    return root
+
+def apply_substitution(fact_template: ParsedFact, sub: Substitution) -> Fact:
+    """Applies a substitution to a parsed fact template to generate a concrete fact."""
+    pred, args = fact_template
     if not args:
         return pred # No arguments to substitute
     
-    new_args = [sub.get(arg, arg) for arg in args]
-    return f"{pred}({','.join(new_args)})"
+    # Each distinct ground fact is formatted once; repeats return the same interned string
+    key = (pred, tuple([resolve(sub, arg) for arg in args]))
+    fact = _FACT_INTERN.get(key)
+    if fact is None:
+        fact = _FACT_INTERN[key] = sys.intern(f"{pred}({','.join(key[1])})")
+        _PARSE_CACHE[fact] = key
+    return fact
 
-def unify(pattern: Fact, fact: Fact, existing_sub: Substitution) -> Optional[Substitution]:
+def unify(pattern: ParsedFact, fact: ParsedFact, sub: Substitution, trail: Trail) -> bool:
     """
-    Unifies a pattern (from a rule premise) with a fact (from the KB).
-    Returns a new substitution on success, None on failure.
+    Unifies a parsed pattern (from a rule premise) with a parsed fact (from the KB).
+    Extends sub in place, recording every variable it (re)binds on the trail.
+    Returns True on success, False on failure (the caller undoes the trail either way).
     """
-    p_pred, p_args = parse_fact(pattern)
-    f_pred, f_args = parse_fact(fact)
-
-    if p_pred != f_pred or len(p_args) != len(f_args):
-        return None
+    # The fact comes from the premise's (predicate, arity) bucket, so only the arguments need checking
+    p_args = pattern[1]
+    f_args = fact[1]
 
-    new_sub = existing_sub.copy()
     for p_arg, f_arg in zip(p_args, f_args):
         # Resolve the pattern's argument using any existing substitutions
-        p_arg_resolved = new_sub.get(p_arg, p_arg)
+        p_arg_resolved = resolve(sub, p_arg, compress=False)
         
-        if is_variable(p_arg):
-            if is_variable(p_arg_resolved):
+        # Every term here came out of parse_fact, so a set lookup replaces is_variable
+        if p_arg in _VARIABLES:
+            if p_arg_resolved in _VARIABLES:
                 # If the variable is unbound, bind it to the fact's argument.
-                new_sub[p_arg] = f_arg
+                trail.append((p_arg, sub.get(p_arg)))
+                sub[p_arg] = f_arg
             elif p_arg_resolved != f_arg:
                 # If the variable is already bound to something else, fail.
-                return None
+                return False
         elif p_arg_resolved != f_arg:
             # If the pattern has a constant, it must match the fact's constant.
-            return None
+            return False
             
-    return new_sub
+    return True
+
+def premise_key(premise: ParsedFact) -> IndexKey:
+    """
+    Picks the narrowest KB index key for a premise from its ground (constant) arguments:
+    the fact itself if fully ground, (pred, arity, position, value) of its first constant
+    if partially ground, and plain (pred, arity) if every argument is a variable.
+    """
+    pred, args = premise
+    ground_mask = [not is_variable(arg) for arg in args]
+    if all(ground_mask):
+        return premise
+    if any(ground_mask):
+        pos = ground_mask.index(True)
+        return (pred, len(args), pos, args[pos])
+    return (pred, len(args))
+
+def parse_rule(rule: Rule) -> ParsedRule:
+    """
+    Parses a rule's premises and conclusion once, along with each premise's index key.
+    Also records the conclusion's variables and an empty per-rule cache of inferred facts
+    keyed by the values bound to them.
+    """
+    premises, conclusion = rule
+    parsed_premises = [parse_fact(p) for p in premises]
+    parsed_conclusion = parse_fact(conclusion)
+    concl_vars = tuple(arg for arg in parsed_conclusion[1] if is_variable(arg))
+    return parsed_premises, [premise_key(p) for p in parsed_premises], parsed_conclusion, concl_vars, {}
+
+def index_facts(facts: List[Fact], kb_by_pred: KBIndex):
+    """
+    Adds the parsed facts to the KB index. Each fact is bucketed under (predicate, arity),
+    under (predicate, arity, position, value) for each of its arguments, and under itself,
+    so a fully ground premise is a single lookup.
+    """
+    for fact in facts:
+        pred, args = parsed = parse_fact(fact)
+        arity = len(args)
+        kb_by_pred.setdefault((pred, arity), []).append(parsed)
+        for pos, arg in enumerate(args):
+            kb_by_pred.setdefault((pred, arity, pos, arg), []).append(parsed)
+        kb_by_pred[parsed] = [parsed]
 
-def find_substitutions_for_premises(premises: List[Fact], kb: Set[Fact], initial_sub: Substitution) -> Generator[Substitution, None, None]:
+def _ordered_premises(premises: List[ParsedFact], keys: List[IndexKey], kb_by_pred: KBIndex) -> List[int]:
     """
-    A recursive generator that finds all valid substitutions for a list of premises.
-    It yields each valid substitution dictionary.
+    Returns the premise indices in most-constrained-first order: start with the premise
+    that has the fewest candidate facts, then prefer premises sharing a variable that is
+    already bound (bucket size breaks ties).
+    """
+    sizes = [len(kb_by_pred.get(key, ())) for key in keys]
+    remaining = list(range(len(premises)))
+    bound: Set[str] = set()
+    order = []
+    while remaining:
+        best = min(remaining, key=lambda i: (not any(arg in bound for arg in premises[i][1]), sizes[i]))
+        remaining.remove(best)
+        order.append(best)
+        bound.update(arg for arg in premises[best][1] if is_variable(arg))
+    return order
+
+def _semi_naive_sources(keys: List[IndexKey], kb_by_pred: KBIndex, delta_by_pred: KBIndex) -> List[List[KBIndex]]:
+    """
+    Semi-naive evaluation: a substitution can only infer something new if at least one premise
+    matches a fact added last iteration. Returns one run per premise whose index key got new facts,
+    giving the index each premise is matched against (that premise reads the delta, the rest
+    the full KB). A rule whose premise keys are all unchanged gets no runs.
+    """
+    if delta_by_pred is kb_by_pred:
+        return [[kb_by_pred] * len(keys)]  # First pass: the whole KB is new
+    runs = []
+    for k, key in enumerate(keys):
+        if key in delta_by_pred:
+            sources = [kb_by_pred] * len(keys)
+            sources[k] = delta_by_pred
+            runs.append(sources)
+    return runs
+
+def _undo(sub: Substitution, trail: Trail, mark: int):
+    """Restores every binding changed since the trail was mark entries long."""
+    while len(trail) > mark:
+        var, previous = trail.pop()
+        if previous is None:
+            del sub[var]
+        else:
+            sub[var] = previous  # It was bound to a constant that looks like a variable, e.g. 'a1'
+
+def find_substitutions_for_premises(premises: List[ParsedFact], keys: List[IndexKey], sources: List[KBIndex], initial_sub: Substitution) -> Generator[Substitution, None, None]:
+    """
+    Finds all valid substitutions for a list of premises with an iterative depth-first search.
+    It yields each valid substitution dictionary. Premise i is matched against the facts stored
+    under keys[i] in the index sources[i].
+    Each stack frame is (premise index, iterator over that premise's candidate facts, trail mark).
+    All frames share one substitution; backtracking undoes the bindings recorded on the trail.
     """
     if not premises:
         yield initial_sub
         return
 
-    current_premise = premises[0]
-    remaining_premises = premises[1:]
+    # Only facts agreeing with a premise's predicate, arity and key constant are worth trying
+    buckets = [source.get(key, ()) for source, key in zip(sources, keys)]
+    last = len(premises) - 1
+    sub = dict(initial_sub)
+    trail: Trail = []
+    stack = [(0, iter(buckets[0]), 0)]
+    while stack:
+        i, facts, mark = stack[-1]
+        # Find the next fact in the KB that unifies with premise i
+        for fact in facts:
+            _undo(sub, trail, mark)  # Drop the bindings of the previous candidate
+            if unify(premises[i], fact, sub, trail):
+                break
+        else:
+            _undo(sub, trail, mark)
+            stack.pop()  # No more candidates, backtrack
+            continue
 
-    # For the current premise, find a fact in the KB that unifies with it
-    for fact in kb:
-        sub_for_premise = unify(current_premise, fact, initial_sub)
-        
-        if sub_for_premise is not None:
-            # If unification succeeds, recurse to find matches for the rest of the premises
-            for final_sub in find_substitutions_for_premises(remaining_premises, kb, sub_for_premise):
-                yield final_sub
+        if i == last:
+            yield dict(sub)
+        else:
+            stack.append((i + 1, iter(buckets[i + 1]), len(trail)))
+
+def compile_rule(premises: List[ParsedFact], keys: List[IndexKey]) -> Matcher:
+    """
+    Generates a matcher specialised to one ordering of a rule's premises: a nested for loop per
+    premise over its index bucket, with the constant checks and variable bindings written out
+    inline instead of going through unify. fire(sources) yields the same substitutions as
+    find_substitutions_for_premises(premises, keys, sources, {}). Matchers are cached by premise order.
+    """
+    cache_key = tuple(premises)
+    fire = _COMPILED_RULES.get(cache_key)
+    if fire is not None:
+        return fire
+
+    lines = ['def fire(sources):']
+    indent = '    '
+    current: Dict[str, str] = {}  # Rule variable -> local name holding its value
+    bound_order: List[str] = []   # Rule variables in the order they get bound
+    for i, (pred, args) in enumerate(premises):
+        # The bucket already guarantees the predicate and arity
+        lines.append(f'{indent}for f{i} in sources[{i}].get(keys[{i}], ()):')
+        indent += '    '
+        if args:
+            lines.append(f'{indent}a{i} = f{i}[1]')
+        for j, arg in enumerate(args):
+            value = f'a{i}[{j}]'
+            if not is_variable(arg):
+                lines.append(f'{indent}if {value} != {arg!r}: continue')
+                continue
+            name = f'v{i}_{j}'
+            lines.append(f'{indent}{name} = {value}')
+            if arg in current:
+                # Already bound, so it must match (unify rebinds it if it was bound to
+                # a constant that looks like a variable)
+                prev = current[arg]
+                lines.append(f'{indent}if {name} != {prev} and {prev} not in VARIABLES: continue')
+            else:
+                bound_order.append(arg)
+            current[arg] = name
+    lines.append(indent + 'yield {' + ', '.join(f'{var!r}: {current[var]}' for var in bound_order) + '}')
 
-def forward_chaining(kb: Set[Fact], rules: List[Rule], query: Fact):
+    namespace = {'keys': tuple(keys), 'VARIABLES': _VARIABLES}
+    exec('\n'.join(lines), namespace)
+    fire = _COMPILED_RULES[cache_key] = namespace['fire']
+    return fire
+
+def forward_chaining(kb: Set[Fact], rules: List[Rule], query: Fact, verbose: bool = False, compiled: bool = True) -> bool:
     """
     Implements the forward chaining algorithm to prove a query.
+    Returns whether the query was proven; the step-by-step trace is only printed if verbose is set.
+    With compiled set, rules are matched by generated code (compile_rule) instead of the generic unifier.
     """
-    print("🚀 Starting Forward Chaining Proof...")
-    print("=====================================")
-    print(f"Initial Knowledge Base: {kb}")
-    print(f"Query to Prove: {query}\n")
+    if verbose:
+        print("🚀 Starting Forward Chaining Proof...")
+        print("=====================================")
+        print(f"Initial Knowledge Base: {kb}")
+        print(f"Query to Prove: {query}\n")
+
+    # Parse every rule and fact once; the inference loop only works on parsed tuples
+    parsed_rules: List[ParsedRule] = [parse_rule(rule) for rule in rules]
+    # The KB is an append-only list with a dict for membership, so the facts added in an
+    # iteration are just the tail of the list past prev_len
+    kb_facts: List[Fact] = list(kb)
+    kb_index: Dict[Fact, int] = {fact: i for i, fact in enumerate(kb_facts)}
+    kb_by_pred: KBIndex = {}
+    index_facts(kb_facts, kb_by_pred)
+    delta_by_pred = kb_by_pred  # Facts added in the last iteration; initially the whole KB
 
     iteration = 1
     while True:
-        new_facts = set()
-        print(f"--- Iteration {iteration} ---")
+        prev_len = len(kb_facts)
+        if verbose:
+            print(f"--- Iteration {iteration} ---")
         
-        for premises, conclusion in rules:
-            # Find all possible substitutions that satisfy the rule's premises
-            for sub in find_substitutions_for_premises(premises, kb, {}):
-                inferred_fact = apply_substitution(conclusion, sub)
+        for (premises, conclusion), (parsed_premises, premise_keys, parsed_conclusion, concl_vars, concl_cache) in zip(rules, parsed_rules):
+            # Find all possible substitutions that satisfy the rule's premises,
+            # matching the most selective premises first as the KB grows
+            order = _ordered_premises(parsed_premises, premise_keys, kb_by_pred)
+            ordered = [parsed_premises[i] for i in order]
+            ordered_keys = [premise_keys[i] for i in order]
+            fire = compile_rule(ordered, ordered_keys) if compiled else None
+            seen: Set[Tuple[Tuple[str, str], ...]] = set() # Substitutions this rule already produced this iteration
+            for sources in _semi_naive_sources(ordered_keys, kb_by_pred, delta_by_pred):
+                matches = fire(sources) if fire else find_substitutions_for_premises(ordered, ordered_keys, sources, {})
+                for sub in matches:
+                    # The semi-naive runs (or symmetric premises) can find the same substitution twice
+                    sub_key = tuple(sorted(sub.items()))
+                    if sub_key in seen:
+                        continue
+                    seen.add(sub_key)
+
+                    # Rules keep firing on the same bindings, so reuse the fact built for them last time
+                    key = tuple([resolve(sub, v) for v in concl_vars])
+                    inferred_fact = concl_cache.get(key)
+                    if inferred_fact is None:
+                        inferred_fact = concl_cache[key] = apply_substitution(parsed_conclusion, sub)
                 
-                # Add the fact only if it's genuinely new
-                if inferred_fact not in kb and inferred_fact not in new_facts:
-                    new_facts.add(inferred_fact)
-                    premise_str = ' & '.join([apply_substitution(p, sub) for p in premises])
-                    print(f"✅ Applied rule: {' & '.join(premises)} => {conclusion}")
-                    print(f"   - With facts: {premise_str}")
-                    print(f"   - Using substitution: {sub}")
-                    print(f"   ==> Inferred: {inferred_fact}\n")
+                    # Add the fact only if it's genuinely new
+                    if inferred_fact not in kb_index:
+                        kb_index[inferred_fact] = len(kb_facts)
+                        kb_facts.append(inferred_fact)
+                        if verbose:
+                            premise_str = ' & '.join([apply_substitution(p, sub) for p in parsed_premises])
+                            print(f"✅ Applied rule: {' & '.join(premises)} => {conclusion}")
+                            print(f"   - With facts: {premise_str}")
+                            print(f"   - Using substitution: {sub}")
+                            print(f"   ==> Inferred: {inferred_fact}\n")
 
         # If no new facts were inferred in a full pass, the process stops
+        new_facts = kb_facts[prev_len:]
         if not new_facts:
-            print("No new facts can be inferred. Halting.")
+            if verbose:
+                print("No new facts can be inferred. Halting.")
             break
         
-        # Add the newly inferred facts to the main knowledge base
-        kb.update(new_facts)
-        print(f"📚 Updated KB with new facts: {new_facts}")
-        print(f"   Current KB size: {len(kb)}\n")
+        # Index the newly inferred facts (already appended to the knowledge base)
+        index_facts(new_facts, kb_by_pred)
+        delta_by_pred = {}
+        index_facts(new_facts, delta_by_pred)
+        if verbose:
+            print(f"📚 Updated KB with new facts: {new_facts}")
+            print(f"   Current KB size: {len(kb_facts)}\n")
         
         # Check if the query has been proven
-        if query in kb:
-            print(f"🎉 Goal '{query}' found in the Knowledge Base!")
+        if query in kb_index:
+            if verbose:
+                print(f"🎉 Goal '{query}' found in the Knowledge Base!")
             break
             
         iteration += 1
 
+    kb.update(kb_facts[len(kb):]) # Hand the inferred facts back in the caller's set
+
     # Final result
-    print("=====================================")
-    if query in kb:
-        print(f"Conclusion: The query '{query}' is proven to be TRUE.")
-    else:
-        print(f"Conclusion: The query '{query}' cannot be proven.")
-    print("=====================================")
+    if verbose:
+        print("=====================================")
+        if query in kb_index:
+            print(f"Conclusion: The query '{query}' is proven to be TRUE.")
+        else:
+            print(f"Conclusion: The query '{query}' cannot be proven.")
+        print("=====================================")
+
+    return query in kb_index
 
 
 if __name__ == '__main__':
@@ -170,4 +401,4 @@ if __name__ == '__main__':
     query: Fact = "Criminal(Robert)"
 
     # 4. Run the forward chaining algorithm
-    forward_chaining(knowledge_base, rules, query)
\ No newline at end of file
+    forward_chaining(knowledge_base, rules, query, verbose=True)
\ No newline at end of file
@@ -1,149 +1,245 @@
-import re
-from typing import Set, List, Dict, Tuple, Optional, Generator
-from graphviz import Digraph
-from IPython.display import display, Image
+import sys
+from typing import Set, List, Dict, Tuple, Generator, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from graphviz import Digraph # Only for the annotation; imported lazily when visualizing
 
 # Define types for clarity
 Fact = str
 Substitution = Dict[str, str]
 Rule = Tuple[List[Fact], Fact]
+ParsedFact = Tuple[str, Tuple[str, ...]]
+IndexKey = tuple  # (pred, arity), (pred, arity, position, value) or a whole ground ParsedFact
+ParsedRule = Tuple[List[ParsedFact], List[IndexKey], ParsedFact, Tuple[str, ...], Dict[Tuple[str, ...], Fact]]
+KBIndex = Dict[IndexKey, List[ParsedFact]]
+
+_PARSE_CACHE: Dict[Fact, ParsedFact] = {}
+_FACT_INTERN: Dict[ParsedFact, Fact] = {}
+_VARIABLES: Set[str] = set()  # Every parsed argument that is_variable, filled in by parse_fact
 
-def parse_fact(fact_string: Fact) -> Tuple[str, List[str]]:
+def parse_fact(fact_string: Fact) -> ParsedFact:
     """
     Parses a string like 'Predicate(Arg1,Arg2)' into a predicate and its arguments.
-    Example: 'Sells(Robert, T1, A)' -> ('Sells', ['Robert', 'T1', 'A'])
+    Example: 'Sells(Robert, T1, A)' -> ('Sells', ('Robert', 'T1', 'A'))
+    Results are cached, so each distinct string is only split once. Names are interned so
+    comparing and hashing atoms during unification is mostly pointer equality.
     """
-    match = re.match(r"(\w+)\((.*?)\)", fact_string)
-    if not match:
-        return fact_string, []  # Handles facts with no arguments
-
-    predicate = match.group(1)
-    args_str = match.group(2)
-
-    if not args_str:
-        return predicate, [] # Handles Predicate()
+    parsed = _PARSE_CACHE.get(fact_string)
+    if parsed is not None:
+        return parsed
 
-    args = [arg.strip() for arg in args_str.split(',')]
-    return predicate, args
+    open_idx = fact_string.find('(')
+    if open_idx < 0:
+        parsed = (sys.intern(fact_string), ())  # Handles facts with no arguments
+    else:
+        predicate = sys.intern(fact_string[:open_idx])
+        args_str = fact_string[open_idx + 1:fact_string.find(')', open_idx)]
+        if not args_str:
+            parsed = (predicate, ()) # Handles Predicate()
+        else:
+            args = tuple(sys.intern(arg.strip()) for arg in args_str.split(','))
+            _VARIABLES.update(arg for arg in args if is_variable(arg))
+            parsed = (predicate, args)
+
+    _PARSE_CACHE[fact_string] = parsed
+    return parsed
 
 def is_variable(term: str) -> bool:
     """A term is a variable if it's a lowercase string."""
     return term[0].islower()
 
-def apply_substitution(conclusion: Fact, sub: Substitution) -> Fact:
-    """Applies a substitution to a conclusion string to generate a new fact."""
-    pred, args = parse_fact(conclusion)
+def resolve(sub: Substitution, term: str, compress: bool = True) -> str:
+    """
+    Follows a chain of bindings (x -> y -> Robert) to its end. With compress set, every
+    variable on the chain is pointed straight at the end so later lookups take one step.
+    unify walks without compressing, since rewriting a binding made in an earlier frame
+    would outlive the trail undo of the binding it skipped over.
+    """
+    root = sub.get(term, term)
+    if root == term or root not in sub:
+        return root # Usual case: unbound, or bound straight to a constant
+    path = [term]
+    while root in sub and root not in path:
+        path.append(root)
+        root = sub[root]
+    if compress:
+        for var in path:
+            sub[var] = root
+    return root
+
+def apply_substitution(conclusion: ParsedFact, sub: Substitution) -> Fact:
+    """Applies a substitution to a parsed conclusion to generate a new fact."""
+    pred, args = conclusion
     if not args:
         return pred
-    new_args = [sub.get(arg, arg) for arg in args]
-    return f"{pred}({','.join(new_args)})"
-
-def unify(pattern: Fact, fact: Fact, sub: Substitution) -> Optional[Substitution]:
+    # Each distinct ground fact is formatted once; repeats return the same interned string
+    key = (pred, tuple([resolve(sub, arg) for arg in args]))
+    fact = _FACT_INTERN.get(key)
+    if fact is None:
+        fact = _FACT_INTERN[key] = sys.intern(f"{pred}({','.join(key[1])})")
+        _PARSE_CACHE[fact] = key
+    return fact
+
+def unify(pattern: ParsedFact, fact: ParsedFact, sub: Substitution, trail: List[str]) -> bool:
     """
-    Unifies a pattern (from a rule premise) with a fact (from KB).
+    Unifies a parsed pattern (from a rule premise) with a parsed fact (from KB).
     Facts are assumed to have no variables.
-    Returns a new substitution on success, None on failure.
+    Extends sub in place, recording every newly bound variable on the trail.
+    Returns True on success, False on failure (the caller undoes the trail either way).
     """
-    p_pred, p_args = parse_fact(pattern)
-    f_pred, f_args = parse_fact(fact)
+    # The fact comes from the premise's (predicate, arity) bucket, so only the arguments need checking
+    p_args = pattern[1]
+    f_args = fact[1]
 
-    if p_pred != f_pred or len(p_args) != len(f_args):
-        return None
-
-    new_sub = sub.copy()
     for p_arg, f_arg in zip(p_args, f_args):
-        # Resolve variable from pattern using existing substitution if available
-        p_arg_resolved = new_sub.get(p_arg, p_arg)
-
-        if is_variable(p_arg_resolved):
-            # If the variable is not yet bound, bind it to the fact's argument.
-            new_sub[p_arg_resolved] = f_arg
-        elif p_arg_resolved != f_arg:
+        # Follow the pattern's argument through existing bindings to the root of its chain
+        root = resolve(sub, p_arg, compress=False)
+
+        # Every term here came out of parse_fact, so a set lookup replaces is_variable
+        if root in _VARIABLES and root not in sub:
+            # The root is a still-unbound variable: bind it (not the key we started from)
+            # to the fact's argument, so every variable on the chain now reaches f_arg.
+            sub[root] = f_arg
+            trail.append(root)
+        elif root != f_arg:
             # If it's a constant or a bound variable, it must match the fact's argument.
-            return None
+            return False
 
-    return new_sub
+    return True
+
+def premise_key(premise: ParsedFact) -> IndexKey:
+    """
+    Picks the narrowest KB index key for a premise from its ground (constant) arguments:
+    the fact itself if fully ground, (pred, arity, position, value) of its first constant
+    if partially ground, and plain (pred, arity) if every argument is a variable.
+    """
+    pred, args = premise
+    ground_mask = [not is_variable(arg) for arg in args]
+    if all(ground_mask):
+        return premise
+    if any(ground_mask):
+        pos = ground_mask.index(True)
+        return (pred, len(args), pos, args[pos])
+    return (pred, len(args))
+
+def parse_rule(rule: Rule) -> ParsedRule:
+    """
+    Parses a rule's premises and conclusion once, along with each premise's index key.
+    Also records the conclusion's variables and an empty per-rule cache of inferred facts
+    keyed by the values bound to them.
+    """
+    premises, conclusion = rule
+    parsed_premises = [parse_fact(p) for p in premises]
+    parsed_conclusion = parse_fact(conclusion)
+    concl_vars = tuple(arg for arg in parsed_conclusion[1] if is_variable(arg))
+    return parsed_premises, [premise_key(p) for p in parsed_premises], parsed_conclusion, concl_vars, {}
 
-def find_substitutions(premises: List[Fact], kb: Set[Fact], initial_sub: Substitution) -> Generator[Substitution, None, None]:
+def index_facts(facts: List[Fact], kb_by_pred: KBIndex):
     """
-    A recursive generator that finds all valid substitutions for a list of premises.
-    It yields each valid substitution dictionary.
+    Adds the parsed facts to the KB index. Each fact is bucketed under (predicate, arity),
+    under (predicate, arity, position, value) for each of its arguments, and under itself,
+    so a fully ground premise is a single lookup.
+    """
+    for fact in facts:
+        pred, args = parsed = parse_fact(fact)
+        arity = len(args)
+        kb_by_pred.setdefault((pred, arity), []).append(parsed)
+        for pos, arg in enumerate(args):
+            kb_by_pred.setdefault((pred, arity, pos, arg), []).append(parsed)
+        kb_by_pred[parsed] = [parsed]
+
+def _ordered_premises(premises: List[ParsedFact], keys: List[IndexKey], kb_by_pred: KBIndex) -> List[int]:
+    """
+    Returns the premise indices in most-constrained-first order: start with the premise
+    that has the fewest candidate facts, then prefer premises sharing a variable that is
+    already bound (bucket size breaks ties).
+    """
+    sizes = [len(kb_by_pred.get(key, ())) for key in keys]
+    remaining = list(range(len(premises)))
+    bound: Set[str] = set()
+    order = []
+    while remaining:
+        best = min(remaining, key=lambda i: (not any(arg in bound for arg in premises[i][1]), sizes[i]))
+        remaining.remove(best)
+        order.append(best)
+        bound.update(arg for arg in premises[best][1] if is_variable(arg))
+    return order
+
+def _semi_naive_sources(keys: List[IndexKey], kb_by_pred: KBIndex, delta_by_pred: KBIndex) -> List[List[KBIndex]]:
+    """
+    Semi-naive evaluation: a substitution can only infer something new if at least one premise
+    matches a fact added last iteration. Returns one run per premise whose index key got new facts,
+    giving the index each premise is matched against (that premise reads the delta, the rest
+    the full KB). A rule whose premise keys are all unchanged gets no runs.
+    """
+    if delta_by_pred is kb_by_pred:
+        return [[kb_by_pred] * len(keys)]  # First pass: the whole KB is new
+    runs = []
+    for k, key in enumerate(keys):
+        if key in delta_by_pred:
+            sources = [kb_by_pred] * len(keys)
+            sources[k] = delta_by_pred
+            runs.append(sources)
+    return runs
+
+def _undo(sub: Substitution, trail: List[str], mark: int):
+    """Unbinds every variable bound since the trail was mark entries long."""
+    while len(trail) > mark:
+        del sub[trail.pop()]
+
+def find_substitutions(premises: List[ParsedFact], keys: List[IndexKey], sources: List[KBIndex], initial_sub: Substitution) -> Generator[Substitution, None, None]:
+    """
+    Finds all valid substitutions for a list of premises with an iterative depth-first search.
+    It yields each valid substitution dictionary. Premise i is matched against the facts stored
+    under keys[i] in the index sources[i].
+    Each stack frame is (premise index, iterator over that premise's candidate facts, trail mark).
+    All frames share one substitution; backtracking undoes the bindings recorded on the trail.
     """
     if not premises:
         yield initial_sub
         return
 
-    current_premise = premises[0]
-    remaining_premises = premises[1:]
-
-    for fact in kb:
-        # Try to unify the current premise with a fact from the KB
-        sub_for_premise = unify(current_premise, fact, initial_sub)
-
-        if sub_for_premise is not None:
-            # If unification succeeds, recurse for the remaining premises
-            for final_sub in find_substitutions(remaining_premises, kb, sub_for_premise):
-                yield final_sub
-
-def forward_chaining(kb: Set[Fact], rules: List[Rule], query: Fact):
+    # Only facts agreeing with a premise's predicate, arity and key constant are worth trying
+    buckets = [source.get(key, ()) for source, key in zip(sources, keys)]
+    last = len(premises) - 1
+    sub = dict(initial_sub)
+    trail: List[str] = []
+    stack = [(0, iter(buckets[0]), 0)]
+    while stack:
+        i, facts, mark = stack[-1]
+        # Find the next fact in the KB that unifies with premise i
+        for fact in facts:
+            _undo(sub, trail, mark)  # Drop the bindings of the previous candidate
+            if unify(premises[i], fact, sub, trail):
+                break
+        else:
+            _undo(sub, trail, mark)
+            stack.pop()  # No more candidates, backtrack
+            continue
+
+        if i == last:
+            yield dict(sub)
+        else:
+            stack.append((i + 1, iter(buckets[i + 1]), len(trail)))
+
+def build_proof_graph(initial_facts: List[Fact], inferred_facts_rules: Dict[Fact, Tuple[List[Fact], Rule]], query: Fact) -> 'Digraph':
     """
-    Implements the forward chaining algorithm and generates a proof graph matching the example.
+    Builds the proof graph matching the example once inference has finished:
+    a box per fact and edges from the facts each inferred fact was derived from.
     """
-    print("🚀 Starting Forward Chaining Proof...")
-    print("=====================================")
-    print(f"Initial Knowledge Base: {kb}")
-    print(f"Query to Prove: {query}\n")
+    from graphviz import Digraph # Imported here so inference alone doesn't need graphviz
 
-    # --- Visualization Setup ---
     dot = Digraph('ForwardChainingProof', comment='Forward Chaining Proof Visualization')
     dot.attr(rankdir='TB', splines='polyline', nodesep='0.6', ranksep='0.8') # Adjust layout for cleaner connections
     dot.attr(bgcolor="white") # Set background to white
 
     # Add initial facts to the graph in a conceptual "layer"
-    for fact in kb:
+    for fact in initial_facts:
         dot.node(fact, fact, shape='box', style='filled', fillcolor='white') # All facts are white boxes
 
-    # Keep track of inferred facts and the rules that generated them
-    inferred_facts_rules: Dict[Fact, Tuple[List[Fact], Rule]] = {}
-
-    iteration = 1
-    while True:
-        new_facts = set()
-        print(f"--- Iteration {iteration} ---")
-
-        # Iterate over rules and try to apply them
-        for rule_idx, (premises_template, conclusion_template) in enumerate(rules):
-            # Find all possible substitutions that satisfy the rule's premises
-            for sub in find_substitutions(premises_template, kb, {}):
-                inferred_fact = apply_substitution(conclusion_template, sub)
-
-                if inferred_fact not in kb and inferred_fact not in new_facts:
-                    new_facts.add(inferred_fact)
-                    premise_str = ' & '.join([apply_substitution(p, sub) for p in premises_template])
-                    print(f"✅ Applied rule: {' & '.join(premises_template)} => {conclusion_template}")
-                    print(f"   - With facts: {premise_str}")
-                    print(f"   - Using substitution: {sub}")
-                    print(f"   ==> Inferred: {inferred_fact}\n")
-
-                    # Store for visualization
-                    inferred_facts_rules[inferred_fact] = ([apply_substitution(p, sub) for p in premises_template], (premises_template, conclusion_template))
-
-                    # Add new fact node to graph
-                    dot.node(inferred_fact, inferred_fact, shape='box', style='filled', fillcolor='white')
-
-        if not new_facts:
-            print("No new facts can be inferred. Halting.")
-            break
-
-        kb.update(new_facts)
-        print(f"📚 Updated KB with new facts: {new_facts}")
-        print(f"   Current KB size: {len(kb)}\n")
-
-        if query in kb:
-            print(f"🎉 Goal '{query}' found in the Knowledge Base!")
-            break # Goal achieved
-
-        iteration += 1
+    # Then the inferred facts, in the order they were inferred
+    for inferred_fact in inferred_facts_rules:
+        dot.node(inferred_fact, inferred_fact, shape='box', style='filled', fillcolor='white')
 
     # Now, add edges and labels based on the inference chain
     for inferred_fact, (source_facts, (premises_template, conclusion_template)) in inferred_facts_rules.items():
@@ -165,27 +261,125 @@ def forward_chaining(kb: Set[Fact], rules: List[Rule], query: Fact):
         if inferred_fact == query:
             dot.node(query, query, shape='box', style='filled', fillcolor='white', penwidth='3', color='black') # Thick black border for query
 
-    # Ensure initial facts also get a standard box if they weren't inferred
-    for fact in knowledge_base:
-        if fact not in inferred_facts_rules: # If not an inferred fact
-             dot.node(fact, fact, shape='box', style='filled', fillcolor='white')
+    return dot
 
+def forward_chaining(kb: Set[Fact], rules: List[Rule], query: Fact, visualize: bool = False, verbose: bool = False) -> bool:
+    """
+    Implements the forward chaining algorithm and, if visualize is set, generates a proof graph matching the example.
+    Returns whether the query was proven; the step-by-step trace is only printed if verbose is set.
+    """
+    if verbose:
+        print("🚀 Starting Forward Chaining Proof...")
+        print("=====================================")
+        print(f"Initial Knowledge Base: {kb}")
+        print(f"Query to Prove: {query}\n")
+
+    initial_facts = list(kb) # kb grows during inference, keep the starting facts for the graph
+
+    # Parse every rule and fact once; the inference loop only works on parsed tuples
+    parsed_rules: List[ParsedRule] = [parse_rule(rule) for rule in rules]
+    # The KB is an append-only list with a dict for membership, so the facts added in an
+    # iteration are just the tail of the list past prev_len
+    kb_facts: List[Fact] = list(kb)
+    kb_index: Dict[Fact, int] = {fact: i for i, fact in enumerate(kb_facts)}
+    kb_by_pred: KBIndex = {}
+    index_facts(kb_facts, kb_by_pred)
+    delta_by_pred = kb_by_pred  # Facts added in the last iteration; initially the whole KB
 
-    # Final result and rendering the graph
-    print("=====================================")
-    if query in kb:
-        print(f"Conclusion: The query '{query}' is proven to be TRUE.")
-    else:
-        print(f"Conclusion: The query '{query}' cannot be proven.")
-    print("=====================================")
+    # Keep track of inferred facts and the rules that generated them
+    inferred_facts_rules: Dict[Fact, Tuple[List[Fact], Rule]] = {}
+
+    iteration = 1
+    while True:
+        prev_len = len(kb_facts)
+        if verbose:
+            print(f"--- Iteration {iteration} ---")
+
+        # Iterate over rules and try to apply them
+        for (premises_template, conclusion_template), (parsed_premises, premise_keys, parsed_conclusion, concl_vars, concl_cache) in zip(rules, parsed_rules):
+            # Find all possible substitutions that satisfy the rule's premises,
+            # matching the most selective premises first as the KB grows
+            order = _ordered_premises(parsed_premises, premise_keys, kb_by_pred)
+            ordered = [parsed_premises[i] for i in order]
+            ordered_keys = [premise_keys[i] for i in order]
+            seen: Set[Tuple[Tuple[str, str], ...]] = set() # Substitutions this rule already produced this iteration
+            for sources in _semi_naive_sources(ordered_keys, kb_by_pred, delta_by_pred):
+                for sub in find_substitutions(ordered, ordered_keys, sources, {}):
+                    # The semi-naive runs (or symmetric premises) can find the same substitution twice
+                    sub_key = tuple(sorted(sub.items()))
+                    if sub_key in seen:
+                        continue
+                    seen.add(sub_key)
+
+                    # Rules keep firing on the same bindings, so reuse the fact built for them last time
+                    key = tuple([resolve(sub, v) for v in concl_vars])
+                    inferred_fact = concl_cache.get(key)
+                    if inferred_fact is None:
+                        inferred_fact = concl_cache[key] = apply_substitution(parsed_conclusion, sub)
+
+                    if inferred_fact not in kb_index:
+                        kb_index[inferred_fact] = len(kb_facts)
+                        kb_facts.append(inferred_fact)
+                        if verbose:
+                            premise_str = ' & '.join([apply_substitution(p, sub) for p in parsed_premises])
+                            print(f"✅ Applied rule: {' & '.join(premises_template)} => {conclusion_template}")
+                            print(f"   - With facts: {premise_str}")
+                            print(f"   - Using substitution: {sub}")
+                            print(f"   ==> Inferred: {inferred_fact}\n")
+
+                        # Store for visualization; the graph itself is built after inference
+                        if visualize:
+                            inferred_facts_rules[inferred_fact] = ([apply_substitution(p, sub) for p in parsed_premises], (premises_template, conclusion_template))
+
+        new_facts = kb_facts[prev_len:]
+        if not new_facts:
+            if verbose:
+                print("No new facts can be inferred. Halting.")
+            break
+
+        index_facts(new_facts, kb_by_pred)
+        delta_by_pred = {}
+        index_facts(new_facts, delta_by_pred)
+        if verbose:
+            print(f"📚 Updated KB with new facts: {new_facts}")
+            print(f"   Current KB size: {len(kb_facts)}\n")
+
+        if query in kb_index:
+            if verbose:
+                print(f"🎉 Goal '{query}' found in the Knowledge Base!")
+            break # Goal achieved
+
+        iteration += 1
 
-    # Render and save the graph
-    try:
-        graph_image = dot.render('forward_chaining_proof', format='png', view=False, cleanup=True)
-        print("\n📊 Visualization of the explanation proof has been saved to 'forward_chaining_proof.png'")
-        display(Image('forward_chaining_proof.png'))
-    except Exception as e:
-        print(f"\nCould not generate visualization. Please ensure you have Graphviz installed. Error: {e}")
+    kb.update(kb_facts[len(kb):]) # Hand the inferred facts back in the caller's set
+
+    # Final result
+    if verbose:
+        print("=====================================")
+        if query in kb_index:
+            print(f"Conclusion: The query '{query}' is proven to be TRUE.")
+        else:
+            print(f"Conclusion: The query '{query}' cannot be proven.")
+        print("=====================================")
+
+    if visualize:
+        # Render and save the graph. Failures are always reported; only the success message is verbose
+        try:
+            from graphviz import ExecutableNotFound
+            from IPython.display import display, Image
+        except ImportError as e:
+            print(f"\nCould not generate visualization. Please ensure graphviz and IPython are installed. Error: {e}")
+        else:
+            try:
+                dot = build_proof_graph(initial_facts, inferred_facts_rules, query)
+                graph_image = dot.render('forward_chaining_proof', format='png', view=False, cleanup=True)
+                if verbose:
+                    print("\n📊 Visualization of the explanation proof has been saved to 'forward_chaining_proof.png'")
+                display(Image('forward_chaining_proof.png'))
+            except (ExecutableNotFound, OSError) as e:
+                print(f"\nCould not generate visualization. Please ensure you have Graphviz installed. Error: {e}")
+
+    return query in kb_index
 
 
 if __name__ == '__main__':
@@ -209,4 +403,4 @@ if __name__ == '__main__':
     query: Fact = "Criminal(Robert)"
 
     # 4. Run the algorithm
-    forward_chaining(knowledge_base, rules, query)
\ No newline at end of file
+    forward_chaining(knowledge_base, rules, query, visualize=True, verbose=True)
\ No newline at end of file